@@ -0,0 +1,277 @@
+import codecs
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from html.parser import HTMLParser
+
+from http_cache import fetch_cached
+
+try:
+    from lxml import etree
+except ImportError:  # fall back to the (slower) stdlib tokenizer
+    etree = None
+
+
+MAX_BYTES = 3 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+BLOCK_TAGS = {"p", "h1", "h2", "h3"}
+HEADING_TAGS = {"h1", "h2", "h3"}
+# subtrees that never hold article text
+SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "iframe", "object",
+    "nav", "footer", "aside", "button", "select", "dialog",
+}
+# page-level containers: their class/id/role describe the whole page (a WordPress
+# "has-sidebar" body, an article wrapper) and must never cause it to be skipped
+ROOT_TAGS = {"html", "body", "main", "article"}
+SKIP_ROLES = {"navigation", "banner", "contentinfo", "complementary", "dialog", "alertdialog", "search"}
+# class/id tokens of boilerplate containers (cookie banners, share bars, related links, ...)
+BOILERPLATE_TOKENS = {
+    "nav", "navbar", "menu", "footer", "sidebar", "breadcrumb", "breadcrumbs", "share", "sharing",
+    "social", "related", "recommended", "promo", "advert", "ad", "ads", "sponsored", "newsletter",
+    "subscribe", "signup", "paywall", "popup", "modal", "comments", "comment",
+}
+BOILERPLATE_SUBSTRINGS = ("cookie", "consent", "gdpr")
+# state-modifier prefixes ("has-comments", "with-sidebar", "is-nav-open") describe a
+# container's contents, not what the container is
+MODIFIER_PREFIXES = {"has", "with", "no", "is", "show", "hide", "enable", "disable"}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+}
+
+_PART_RE = re.compile(r"[-_]+")
+_CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+
+
+class ExtractionError(Exception):
+    pass
+
+
+@dataclass
+class Article:
+    url: str = ""
+    title: str = ""
+    headings: list = field(default_factory=list)
+    paragraphs: list = field(default_factory=list)
+    blocks: list = field(default_factory=list)  # [(tag, text), ...] in document order
+    truncated: bool = False
+
+    @property
+    def text(self):
+        return "\n".join(text for _, text in self.blocks)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data["blocks"] = [tuple(block) for block in data.get("blocks", [])]
+        return cls(**data)
+
+
+def _is_boilerplate_name(name):
+    parts = [part for part in _PART_RE.split(name) if part]
+    if not parts or parts[0] in MODIFIER_PREFIXES:
+        return False
+    if any(s in name for s in BOILERPLATE_SUBSTRINGS):
+        return True
+    return not BOILERPLATE_TOKENS.isdisjoint(parts)
+
+
+def _is_boilerplate(tag, attrib):
+    if tag in ROOT_TAGS:
+        return False
+    if attrib.get("role", "").lower() in SKIP_ROLES:
+        return True
+    if attrib.get("aria-hidden") == "true" or "hidden" in attrib:
+        return True
+    names = f"{attrib.get('class', '')} {attrib.get('id', '')}".lower().split()
+    return any(_is_boilerplate_name(name) for name in names)
+
+
+class _ArticleTarget:
+    """Parser target (lxml `target=` protocol) that collects text blocks as the
+    document streams in, without ever building a tree."""
+
+    def __init__(self):
+        self.article = Article()
+        self._stack = []  # [(tag, starts_skip)]
+        self._skipping = 0
+        self._block = None
+        self._buf = []
+        self._in_title = False
+        self._title_buf = []
+
+    def start(self, tag, attrib):
+        tag = tag.lower()
+        if tag == "title":
+            self._in_title = True
+        if tag in VOID_TAGS:
+            return
+        starts_skip = tag in SKIP_TAGS or _is_boilerplate(tag, attrib)
+        if starts_skip:
+            self._skipping += 1
+        self._stack.append((tag, starts_skip))
+        if tag in BLOCK_TAGS and not self._skipping:
+            self._flush()
+            self._block = tag
+
+    def end(self, tag):
+        tag = tag.lower()
+        if tag == "title":
+            self._in_title = False
+        if not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, starts_skip = self._stack.pop()
+            if open_tag == self._block:
+                self._flush()
+            if starts_skip:
+                self._skipping -= 1
+            if open_tag == tag:
+                break
+
+    def data(self, text):
+        if self._in_title:
+            self._title_buf.append(text)
+        elif self._block and not self._skipping:
+            self._buf.append(text)
+
+    def _flush(self):
+        if self._block:
+            text = " ".join("".join(self._buf).split())
+            if text:
+                self.article.blocks.append((self._block, text))
+                if self._block in HEADING_TAGS:
+                    self.article.headings.append(text)
+                else:
+                    self.article.paragraphs.append(text)
+        self._block = None
+        self._buf = []
+
+    def close(self):
+        self._flush()
+        page_title = " ".join("".join(self._title_buf).split())
+        h1 = next((text for tag, text in self.article.blocks if tag == "h1"), "")
+        self.article.title = h1 or page_title
+        return self.article
+
+
+class _StdlibParser(HTMLParser):
+    # adapts html.parser callbacks to the lxml target protocol
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self._target = target
+
+    def handle_starttag(self, tag, attrs):
+        self._target.start(tag, {k: v or "" for k, v in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        self._target.start(tag, {k: v or "" for k, v in attrs})
+        if tag not in VOID_TAGS:
+            self._target.end(tag)
+
+    def handle_endtag(self, tag):
+        self._target.end(tag)
+
+    def handle_data(self, data):
+        self._target.data(data)
+
+    def close(self):
+        super().close()
+        return self._target.close()
+
+
+def _new_parser(encoding=None):
+    target = _ArticleTarget()
+    if etree is not None:
+        return etree.HTMLParser(target=target, encoding=encoding, remove_comments=True), None
+    decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    return _StdlibParser(target), decoder
+
+
+def _sniff_charset(head):
+    # a BOM or <meta charset> in the first chunk; otherwise UTF-8, as browsers and
+    # BeautifulSoup effectively do today, rather than libxml2's Latin-1 default
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    match = _META_CHARSET_RE.search(head)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except (LookupError, UnicodeDecodeError):
+            pass
+    return "utf-8"
+
+
+def parse_chunks(chunks, encoding=None, max_bytes=MAX_BYTES):
+    """Incrementally parse an iterable of byte chunks, stopping after `max_bytes`.
+    Without an `encoding`, it is sniffed from the first chunk."""
+    parser = decoder = None
+    received = 0
+    truncated = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if received + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - received]
+            truncated = True
+        received += len(chunk)
+        if parser is None:
+            parser, decoder = _new_parser(encoding or _sniff_charset(chunk))
+        parser.feed(decoder.decode(chunk) if decoder else chunk)
+        if truncated:
+            break
+    if parser is None:
+        parser, decoder = _new_parser(encoding or "utf-8")
+    if decoder:
+        parser.feed(decoder.decode(b"", final=True))
+    article = parser.close()
+    article.truncated = truncated
+    return article
+
+
+def parse_html(html, max_bytes=MAX_BYTES):
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+        return parse_chunks([html], encoding="utf-8", max_bytes=max_bytes)
+    return parse_chunks([html], max_bytes=max_bytes)
+
+
+def _declared_charset(response):
+    # requests falls back to ISO-8859-1 for any text/* body; only trust an explicit charset
+    match = _CHARSET_RE.search(response.headers.get("Content-Type", ""))
+    if not match:
+        return None
+    try:
+        return codecs.lookup(match.group(1)).name
+    except LookupError:
+        return None
+
+
+def parse_response(response, max_bytes=MAX_BYTES):
+    content_type = response.headers.get("Content-Type", "text/html").lower()
+    if "html" not in content_type and "xml" not in content_type and not content_type.startswith("text/"):
+        raise ExtractionError(f"Failed to extract article: unsupported content type {content_type.split(';')[0]}")
+    article = parse_chunks(
+        response.iter_content(CHUNK_SIZE), encoding=_declared_charset(response), max_bytes=max_bytes
+    )
+    article.url = response.url
+    return article
+
+
+def extract_article(url, max_bytes=MAX_BYTES):
+    payload = fetch_cached(
+        url,
+        lambda response: json.dumps(parse_response(response, max_bytes=max_bytes).to_dict()),
+        namespace="article.json",
+    )
+    article = Article.from_dict(json.loads(payload))
+    if not article.blocks:
+        raise ExtractionError("No meaningful content found on the page.")
+    return article
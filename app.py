@@ -1,17 +1,18 @@
+import sqlite3
+import time
+
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-import json
 
-from web_fetcher import (
-    get_top_news,
-    get_stock_blog_rss,
-    get_reddit_posts
-)
+from analyze import ExtractionError, extract_article
+from dedup import TITLE_THRESHOLD, NearDuplicateIndex, collapse_near_duplicates
+from http_cache import FetchError, get_cache
+from llm import DEFAULT_PARAMS, CompletionStats, LLMError, TogetherClient
+from memory_store import get_history_store
+from result_cache import content_hash, get_result_cache
+from summarizer import summarize
+from web_fetcher import ERROR_TTL, SOURCES, clear_results, fetch_all_sources
 
 # session state initialization
-if "memory" not in st.session_state:
-    st.session_state.memory = []
 if "mode" not in st.session_state:
     st.session_state.mode = "URL Summarizer"
 if "auto_url" not in st.session_state:
@@ -29,81 +30,61 @@ if "auto_url" in query_params and not st.session_state.auto_url_triggered:
 
 # API keys
 TOGETHER_API_KEY = st.secrets["TOGETHER_API_KEY"]
-news_key = st.secrets["newsapi"]
-reddit_id = st.secrets["reddit"]["client_id"]
-reddit_secret = st.secrets["reddit"]["client_secret"]
-reddit_agent = st.secrets["reddit"]["user_agent"]
+
+TREND_WINDOWS = {"24 hours": "1D", "7 days": "7D", "30 days": "30D"}
 
 # LLaMA REQUEST 
-headers = {
-    "Authorization": f"Bearer {TOGETHER_API_KEY}",
-    "Content-Type": "application/json"
-}
-API_URL = "https://api.together.xyz/v1/chat/completions"
+@st.cache_resource
+def get_llm_client(api_key):
+    # one pooled client per process, reused across reruns and sessions
+    return TogetherClient(api_key)
 
-def extract_text_from_url(url):
-    try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        if response.status_code != 200:
-            return f"Failed to fetch article: {response.status_code}"
-
-        soup = BeautifulSoup(response.content, "html.parser")
-        paragraphs = soup.find_all(["p", "h1", "h2", "h3"])
-        article_text = "\n".join(
-            [p.get_text().strip() for p in paragraphs if p.get_text().strip()]
-        )
+llm_client = get_llm_client(TOGETHER_API_KEY)
+
+@st.cache_resource
+def get_feed_poller():
+    # pandas/pyarrow are only imported once someone opens the dashboard
+    from poller import FeedPoller
+
+    return FeedPoller(st.secrets).start()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_trend_items(store_version, window):
+    import pandas as pd
+    import visualize
 
-        return article_text if article_text else "No meaningful content found on the page."
+    since = None if window == "All" else pd.Timestamp.now(tz="UTC") - pd.Timedelta(TREND_WINDOWS[window])
+    frame = visualize.load_items(since=since)
+    return frame, visualize.title_words(frame) if not frame.empty else None
+
+def load_article(url):
+    try:
+        article = extract_article(url)
+        return article, article.text
+    except (FetchError, ExtractionError) as e:
+        return None, str(e)
     except Exception as e:
-        return f"Error fetching content: {e}"
-
-def query_llama_together(article_text, query):
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are an expert research assistant. "
-                "Summarize news articles clearly and answer user questions precisely using only the article content. Avoid speculation. "
-                "Have a sarcastic tone when appropriate, but always be helpful. "
-                "If the user asks for your opinion, make it funny and engaging."
-            )
-        },
-        {
-            "role": "user",
-            "content": f"""Here's an article I want you to analyze:
-
-{article_text}
-
-Now, follow these steps:
-1. Give a concise **summary** of the article.
-2. If the following question is provided, answer it using only the article content:
-
-**Question**: {query if query.strip() else 'No question was asked'}
-
-Begin your response below:
-"""
-        }
-    ]
-
-    payload = {
-        "model": "meta-llama/Llama-3-70b-chat-hf", 
-        "messages": messages,
-        "temperature": 0.7,
-        "top_p": 0.9,
-        "max_tokens": 1024
-    }
-
-    response = requests.post(API_URL, headers=headers, data=json.dumps(payload))
-
-    if response.status_code == 200:
-        return response.json()["choices"][0]["message"]["content"]
-    else:
-        return f"API Error {response.status_code}: {response.text}"
+        return None, f"Error fetching content: {e}"
+
+def query_llama_together(article, query, stats=None, on_progress=None):
+    # yields the completion token by token; errors are yielded as text like before
+    result = ""
+    try:
+        for token in summarize(llm_client, article, query, stats=stats, on_progress=on_progress):
+            result += token
+            yield token
+    except LLMError as e:
+        yield str(e)
+        return
+    try:
+        get_result_cache().put(article.text, query, llm_client.model, DEFAULT_PARAMS, result, url=article.url)
+    except sqlite3.Error:
+        pass  # the summary is already on screen; caching it is best-effort
 
 # ----------------- FRONTEND LOGIC -----------------
 st.title(" OpenLens – Unified AI Web Analyzer")
 
-mode = st.radio("Choose Mode:", ["URL Summarizer", "Web Data Explorer"])
+mode = st.radio("Choose Mode:", ["URL Summarizer", "Web Data Explorer", "Trend Dashboard"])
 st.session_state.mode = mode
 
 # URL SUMMARIZER
@@ -121,28 +102,51 @@ if st.session_state.mode == "URL Summarizer":
         st.session_state.auto_url_triggered = False
 
         with st.spinner("Extracting article content..."):
-            article_text = extract_text_from_url(url)
+            article, article_text = load_article(url)
             st.subheader(" Article Preview")
             st.write(article_text[:500] + "...")
+            stats = get_cache().stats
+            st.caption(f"Fetch cache: {stats.hits} hits ({stats.revalidated} revalidated) / {stats.misses} misses")
 
-        if (
-            not article_text
-            or "Failed" in article_text
-            or "Error" in article_text
-            or "No meaningful content" in article_text
-        ):
+        if article is None or not article_text:
             st.error(" Could not extract meaningful article content. Try a different link.")
         else:
-            with st.spinner("Querying LLaMA 3.1..."):
-                result = query_llama_together(article_text, query)
-                st.subheader("Here's what I found:")
-
-                st.session_state.memory.append({
-                    "url": url,
-                    "question": query,
-                    "summary_answer": result
-                })
-
+            st.subheader("Here's what I found:")
+            panel = st.empty()
+            llm_stats = CompletionStats()
+            cached = get_result_cache().get(article_text, query, llm_client.model, DEFAULT_PARAMS)
+            if cached:
+                result = cached.result
+            else:
+                result = ""
+                progress = st.empty()
+
+                def show_progress(done, total):
+                    progress.progress(done / total, text=f"Condensed {done}/{total} sections of a long article...")
+
+                with st.spinner("Querying LLaMA 3.1..."):
+                    for token in query_llama_together(article, query, stats=llm_stats, on_progress=show_progress):
+                        result += token
+                        panel.markdown("###  Summary\n" + result + "▌")
+                progress.empty()
+
+            try:
+                get_history_store().add(
+                    url,
+                    query,
+                    result,
+                    timings={
+                        "ttft": llm_stats.ttft,
+                        "total": llm_stats.total,
+                        "tokens_per_sec": llm_stats.tokens_per_sec,
+                        "cached": bool(cached),
+                    },
+                    content_hash=content_hash(article_text),
+                )
+            except sqlite3.Error as e:
+                st.warning(f"Could not save this analysis to memory: {e}")
+
+            with panel.container():
                 if "Answer:" in result:
                     summary, answer = result.split("Answer:", 1)
                     st.markdown("###  Summary")
@@ -158,48 +162,122 @@ if st.session_state.mode == "URL Summarizer":
                 else:
                     st.markdown("###  Summary & Answer")
                     st.markdown(result.strip())
+            if cached and cached.near_duplicate:
+                st.caption(f"Reused the summary of a near-duplicate article: {cached.url}")
+            elif cached:
+                st.caption("Served from the result cache")
+            else:
+                st.caption(llm_stats.summary())
 
 #  WEB DATA EXPLORER 
 elif st.session_state.mode == "Web Data Explorer":
     if st.button(" Fetch Real-Time Data"):
-        news = get_top_news(news_key)
-        stocks = get_stock_blog_rss()
-        reddit = get_reddit_posts(reddit_id, reddit_secret, reddit_agent)
-
-        st.markdown("###  Top News")
-        for i, article in enumerate(news[:10]):
-            if isinstance(article, dict) and "title" in article and "url" in article:
-                st.markdown(f"{i+1}. [{article['title']}](/?auto_url={article['url']})")
-            else:
-                st.markdown(f"{i+1}.  {article}")
-
-        st.markdown("###  Stock Blogs")
-        for i, post in enumerate(stocks[:10]):
-            if isinstance(post, dict):
-                st.markdown(f"{i+1}. [{post['title']}](/?auto_url={post['link']})")
-            else:
-                st.markdown(f"{i+1}.  {post}")
+        st.session_state.explorer_loaded = True
+        # an explicit click retries failed sources right away; other reruns wait out ERROR_TTL
+        clear_results(failures_only=True)
+
+    # once fetched, keep showing the feeds across reruns; they come from the
+    # short-lived in-process memo in web_fetcher, not from new requests
+    if st.session_state.get("explorer_loaded"):
+        seen_titles = NearDuplicateIndex(threshold=TITLE_THRESHOLD)
+        # one placeholder per source, filled in whichever order the sources finish
+        placeholders = {name: st.empty() for name in SOURCES}
+        for name, source in SOURCES.items():
+            placeholders[name].markdown(f"###  {source.title}\n_Loading..._")
+
+        for result in fetch_all_sources(st.secrets):
+            source = result.source
+            with placeholders[source.name].container():
+                st.markdown(f"###  {source.title}")
+                if not result.ok:
+                    st.error(result.error)
+                    if result.cached:
+                        st.caption(f"failed recently; retried after {ERROR_TTL}s or when you click Fetch")
+                    else:
+                        st.caption(f"failed after {result.latency:.2f}s")
+                    continue
+
+                # the same wire story often shows up in several feeds; list it only once
+                items, duplicates = collapse_near_duplicates(
+                    result.items, seen_titles,
+                    key=lambda item: item.get("title") if isinstance(item, dict) else None,
+                    label=source.title,
+                )
+                caption = f"{len(result.items)} items (cached)" if result.cached else f"{len(result.items)} items in {result.latency:.2f}s"
+                if duplicates:
+                    caption += f" · {len(duplicates)} near-duplicates collapsed"
+                st.caption(caption)
+                for i, item in enumerate(items[:10]):
+                    if isinstance(item, dict) and "title" in item and source.link_key in item:
+                        st.markdown(f"{i+1}. [{item['title']}](/?auto_url={item[source.link_key]})")
+                    else:
+                        st.markdown(f"{i+1}.  {item}")
+
+#  TREND DASHBOARD 
+elif st.session_state.mode == "Trend Dashboard":
+    import visualize
+    from components.graphing import volume_chart
+
+    poller = get_feed_poller()
+    status = poller.status
+    if status.last_poll:
+        st.caption(
+            f"Polling every {poller.interval:g}s · last poll {time.strftime('%H:%M:%S', time.localtime(status.last_poll))} · "
+            f"new items: {sum(status.new_items.values())}"
+        )
+    for name, error in status.errors.items():
+        st.warning(f"{name}: {error}")
+    if st.button("Poll now"):
+        with st.spinner("Polling feeds..."):
+            poller.poll_once()
+        st.rerun()
+
+    window = st.selectbox("Window", list(TREND_WINDOWS) + ["All"], index=1)
+    frame, words = load_trend_items(poller.store.version(), window)
+    if frame.empty:
+        st.info("No feed items collected yet. The poller runs in the background; check back shortly.")
+    else:
+        freq = visualize.choose_frequency(frame)
+        st.caption(f"{len(frame):,} items · bucketed by {freq}")
+        st.plotly_chart(volume_chart(visualize.source_volume(frame, freq), "Items per source"), width="stretch")
 
-        st.markdown("###  Reddit Posts")
-        for i, post in enumerate(reddit[:10]):
-            if isinstance(post, dict):
-                st.markdown(f"{i+1}. [{post['title']}](/?auto_url={post['url']})")
-            else:
-                st.markdown(f"{i+1}. {post}")
+        suggested = visualize.top_keywords(frame, words=words)
+        keywords = st.text_input("Keywords (comma separated)", value=", ".join(suggested), key="trend_keywords")
+        keywords = [keyword.strip() for keyword in keywords.split(",") if keyword.strip()]
+        if keywords:
+            volume = visualize.keyword_volume(frame, keywords, freq, words=words)
+            st.plotly_chart(volume_chart(volume, "Keyword mentions"), width="stretch")
 
 #  SESSION MEMORY 
+MEMORY_PAGE_SIZE = 10
+
 with st.sidebar.expander("Session Memory", expanded=False):
-    if st.session_state.memory:
+    history = get_history_store()
+    search = st.text_input("Search past summaries", key="memory_search").strip()
+    total = history.count(search)
+    if total:
+        # only the visible page is read from the store, never the whole history
+        pages = -(-total // MEMORY_PAGE_SIZE)
+        page = 1
+        if pages > 1:
+            # keyed by the search so a narrower search starts back on page 1
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=f"memory_page:{search}")
+            st.caption(f"{total} memories · {pages} pages")
+        offset = (page - 1) * MEMORY_PAGE_SIZE
+        entries = history.page(offset, MEMORY_PAGE_SIZE, search)
+        labels = {entry.id: f"{offset + i + 1}. {entry.url}" for i, entry in enumerate(entries)}
         selected = st.radio(
             "Select a memory to display:",
-            [f"{i+1}. {item['url']}" for i, item in enumerate(st.session_state.memory[::-1])],
+            list(labels),
+            format_func=labels.get,
             index=0,
             key="memory_select"
         )
-        idx = int(selected.split(". ")[0]) - 1
-        mem_item = st.session_state.memory[::-1][idx]
+        mem_item = history.get(selected)
 
-        st.markdown(f"**Query:** {mem_item['question'] if mem_item['question'] else 'N/A'}")
-        st.markdown(f"**Summary/Answer:**\n{mem_item['summary_answer']}")
+        st.markdown(f"**Query:** {mem_item.question if mem_item.question else 'N/A'}")
+        st.markdown(f"**Summary/Answer:**\n{mem_item.summary}")
+    elif search:
+        st.write("No matching memories.")
     else:
         st.write("No memory yet.")
@@ -0,0 +1,128 @@
+"""Compare the streaming extractor in analyze.py with the original BeautifulSoup path.
+
+    python benchmarks/bench_extract.py [--repeat 20] [--scale 50]
+
+Each fixture in benchmarks/fixtures is parsed as-is and as a "heavy" page whose
+<article> body is repeated --scale times, which is closer to a long live page
+with comments and related-story rails.
+
+Memory is the extra peak RSS of one extraction in a fresh interpreter (Linux,
+read from /proc), so it includes libxml2's buffers as well as Python objects (tracemalloc would only
+see the latter, and undercount the lxml path).
+"""
+import argparse
+import glob
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analyze  # noqa: E402
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(BENCH_DIR, "fixtures")
+
+# Linux: reset the peak (VmHWM) to the current RSS after imports, so the reading
+# is the extraction's own peak rather than the interpreter's startup high-water mark
+RSS_PROBE = textwrap.dedent("""
+    import sys
+    sys.path.insert(0, {bench_dir!r})
+    import bench_extract
+
+    def status(field):
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith(field + ":"))
+
+    content = open({path!r}, "rb").read()
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    before = status("VmRSS")
+    bench_extract.{fn}(content)
+    print(status("VmHWM") - before)
+""")
+
+
+def legacy_extract(content):
+    # the extractor app.py shipped before analyze.py
+    soup = BeautifulSoup(content, "html.parser")
+    paragraphs = soup.find_all(["p", "h1", "h2", "h3"])
+    return "\n".join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+
+
+def streaming_extract(content):
+    chunks = (content[i:i + analyze.CHUNK_SIZE] for i in range(0, len(content), analyze.CHUNK_SIZE))
+    return analyze.parse_chunks(chunks).text
+
+
+def scaled(content, scale):
+    start, end = content.find(b"<body"), content.rfind(b"</body>")
+    if scale <= 1 or start < 0 or end < 0:
+        return content
+    return content[:end] + content[start:end] * (scale - 1) + content[end:]
+
+
+def measure(fn, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(content)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def peak_rss(fn, path):
+    # /proc reports KiB
+    out = subprocess.run(
+        [sys.executable, "-c", RSS_PROBE.format(bench_dir=BENCH_DIR, path=path, fn=fn.__name__)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return int(out.strip().splitlines()[-1]) * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scale", type=int, default=50)
+    args = parser.parse_args()
+
+    backend = "lxml" if analyze.etree is not None else "html.parser"
+    print(f"streaming backend: {backend}")
+    print(f"{'page':<28}{'size':>10}{'legacy ms':>12}{'stream ms':>12}{'speedup':>9}{'legacy RSS':>12}{'stream RSS':>12}{'blocks':>8}")
+
+    scratch = tempfile.NamedTemporaryFile(suffix=".html", delete=False)
+    scratch.close()
+    try:
+        for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html"))):
+            raw = open(path, "rb").read()
+            for label, content in ((os.path.basename(path), raw), (f"{os.path.basename(path)} x{args.scale}", scaled(raw, args.scale))):
+                with open(scratch.name, "wb") as f:
+                    f.write(content)
+                report(label, content, scratch.name, args.repeat)
+    finally:
+        os.remove(scratch.name)
+
+
+def report(label, content, path, repeat):
+    legacy_time = measure(legacy_extract, content, repeat)
+    stream_time = measure(streaming_extract, content, repeat)
+    legacy_mem = peak_rss(legacy_extract, path)
+    stream_mem = peak_rss(streaming_extract, path)
+    # an extractor that skips the whole page is fast for the wrong reason
+    blocks = len(analyze.parse_html(content).blocks)
+    print(
+        f"{label:<28}{len(content) / 1024:>8.0f}KB"
+        f"{legacy_time * 1000:>12.2f}{stream_time * 1000:>12.2f}{legacy_time / stream_time:>8.1f}x"
+        f"{legacy_mem / 2**20:>9.2f} MB{stream_mem / 2**20:>9.2f} MB{blocks:>8}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Measure Streamlit cold start and per-interaction rerun time for app.py.
+
+    python benchmarks/bench_startup.py [--runs 5] [--reruns 20]
+
+Cold numbers come from fresh interpreters so nothing is already in sys.modules:
+  import      time to import web_fetcher / every module app.py imports at the top
+              (on top of streamlit), and then the ones it imports inside functions
+  first run   time for the first full script run of app.py
+Rerun numbers are from one interpreter driving the app with streamlit's AppTest,
+flipping between the two modes the way a user clicking around would.
+No network access is needed; nothing is fetched.
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import textwrap
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = textwrap.dedent("""
+    import time, streamlit
+    {preload}
+    started = time.perf_counter()
+    import {modules}
+    print(time.perf_counter() - started)
+""")
+
+FIRST_RUN_PROBE = textwrap.dedent("""
+    import time, logging
+    logging.disable(logging.WARNING)
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file("app.py", default_timeout=60)
+    started = time.perf_counter()
+    at.run()
+    assert not at.exception, at.exception
+    print(time.perf_counter() - started)
+""")
+
+
+def app_imports(path=os.path.join(ROOT, "app.py")):
+    """(eager, lazy) module names imported by app.py, read from its source so the
+    benchmark measures whichever revision of the app is checked out. Eager ones
+    are imported at the top of the script; lazy ones inside functions or mode
+    branches, so only some reruns pay for them."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    top_level = {id(node) for node in tree.body}
+    eager, lazy = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            names = [node.module]
+        else:
+            continue
+        target = eager if id(node) in top_level else lazy
+        target.extend(name for name in names if name != "streamlit" and name not in target)
+    return eager, [name for name in lazy if name not in eager]
+
+
+def probe(code, runs):
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(out.strip().splitlines()[-1]))
+    return timings
+
+
+def reruns(count):
+    import logging
+
+    from streamlit.testing.v1 import AppTest
+
+    logging.disable(logging.WARNING)
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    at.run()
+    timings = []
+    modes = ["Web Data Explorer", "URL Summarizer"]
+    for i in range(count):
+        at.radio[0].set_value(modes[i % 2])
+        started = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - started)
+        assert not at.exception, at.exception
+    return timings
+
+
+def show(label, timings):
+    print(f"{label:<20} median {statistics.median(timings) * 1000:8.1f} ms   min {min(timings) * 1000:8.1f} ms   (n={len(timings)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    eager, lazy = app_imports()
+    print(f"app modules: {', '.join(eager)}")
+    if lazy:
+        print(f"lazy modules: {', '.join(lazy)}")
+    show("import web_fetcher", probe(IMPORT_PROBE.format(preload="", modules="web_fetcher"), args.runs))
+    show("import app modules", probe(IMPORT_PROBE.format(preload="", modules=", ".join(eager)), args.runs))
+    if lazy:
+        preload = f"import {', '.join(eager)}"
+        show("import lazy modules", probe(IMPORT_PROBE.format(preload=preload, modules=", ".join(lazy)), args.runs))
+    show("first run", probe(FIRST_RUN_PROBE, args.runs))
+    show("rerun", reruns(args.reruns))
+
+
+if __name__ == "__main__":
+    main()
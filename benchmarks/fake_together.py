@@ -0,0 +1,93 @@
+"""Local stand-in for the Together chat-completions endpoint.
+
+    python benchmarks/fake_together.py --port 8808 --ttft 0.5 --token-delay 0.02 --fail 2
+    OPENLENS_LLM_API_URL=http://127.0.0.1:8808/v1/chat/completions streamlit run app.py
+
+Streams a canned reply as server-sent events when the request has "stream": true,
+otherwise returns a plain JSON completion. --fail N answers the first N requests
+with 429 + Retry-After so the client's backoff path can be exercised.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+REPLY = (
+    "**Summary**: The article reports that demand for AI accelerators keeps outpacing supply, "
+    "lifting chipmaker shares while packaging capacity remains the bottleneck.\n\n"
+    "Answer: Based only on the article, yes - analysts raised their forecasts."
+)
+
+
+def make_handler(args):
+    failures = {"left": args.fail}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_):
+            pass
+
+        def _send_json(self, status, body, headers=()):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with lock:
+                fail = failures["left"] > 0
+                failures["left"] -= fail
+            if fail:
+                self._send_json(429, {"error": {"message": "rate limited"}}, [("Retry-After", str(args.retry_after))])
+                return
+
+            tokens = [word + " " for word in REPLY.split(" ")]
+            if not payload.get("stream"):
+                time.sleep(args.ttft + args.token_delay * len(tokens))
+                self._send_json(200, {"choices": [{"message": {"role": "assistant", "content": REPLY}}]})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            time.sleep(args.ttft)
+            for token in tokens:
+                event = {"choices": [{"index": 0, "delta": {"content": token}}]}
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(args.token_delay)
+            usage = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": {"completion_tokens": len(tokens)}}
+            self.wfile.write(f"data: {json.dumps(usage)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--ttft", type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between tokens")
+    parser.add_argument("--fail", type=int, default=0, help="answer the first N requests with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args))
+    print(f"fake Together endpoint on http://127.0.0.1:{args.port}/v1/chat/completions")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
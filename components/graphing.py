@@ -0,0 +1,17 @@
+import plotly.graph_objects as go
+
+
+def volume_chart(volume, title):
+    """Line chart of a time-indexed frame, one trace per column. Expects data
+    already bucketed by visualize.py, so it stays a few hundred points per trace."""
+    fig = go.Figure()
+    for column in volume.columns:
+        fig.add_trace(go.Scatter(x=volume.index, y=volume[column], name=str(column), mode="lines"))
+    fig.update_layout(
+        title=title,
+        hovermode="x unified",
+        margin=dict(l=10, r=10, t=40, b=10),
+        legend=dict(orientation="h", y=-0.15),
+        yaxis_title="items",
+    )
+    return fig
@@ -0,0 +1,98 @@
+import hashlib
+import re
+
+
+SIMHASH_BITS = 64
+# syndicated copies usually differ only in a byline, dateline or trailing source tag
+DEFAULT_THRESHOLD = 3
+# headlines are only a handful of features, so one inserted word moves more bits
+TITLE_THRESHOLD = 8
+
+_WORD_RE = re.compile(r"\w+")
+# "Headline - Reuters", "Headline | Yahoo Finance"
+_TITLE_SUFFIX_RE = re.compile(r"\s+[-|–—:]\s+[^-|–—:]{2,40}$")
+
+
+def normalize_text(text):
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def normalize_title(title):
+    return normalize_text(_TITLE_SUFFIX_RE.sub("", title.strip()))
+
+
+def _features(words, shingle):
+    if len(words) < shingle:
+        return [" ".join(words)] if words else []
+    # short texts (headlines) also get unigrams so a single changed word does not flip half the features
+    grams = [" ".join(words[i:i + shingle]) for i in range(len(words) - shingle + 1)]
+    return grams + words if len(words) < 40 else grams
+
+
+def simhash(text, shingle=3):
+    words = normalize_text(text).split()
+    weights = [0] * SIMHASH_BITS
+    for feature in _features(words, shingle):
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def bands(value, threshold=DEFAULT_THRESHOLD):
+    """Split a fingerprint into threshold + 1 bands. Two fingerprints within
+    `threshold` bits of each other must agree on at least one band, so an exact
+    lookup per band finds every near-duplicate candidate."""
+    count = threshold + 1
+    edges = [round(i * SIMHASH_BITS / count) for i in range(count + 1)]
+    return [(i, value >> lo & ((1 << (hi - lo)) - 1)) for i, (lo, hi) in enumerate(zip(edges, edges[1:]))]
+
+
+class NearDuplicateIndex:
+    """In-memory banded SimHash index mapping fingerprints to arbitrary values."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._bands = {}
+        self._entries = []
+
+    def find(self, fingerprint):
+        for band in bands(fingerprint, self.threshold):
+            for index in self._bands.get(band, ()):
+                other, value = self._entries[index]
+                if hamming(fingerprint, other) <= self.threshold:
+                    return value
+        return None
+
+    def add(self, fingerprint, value):
+        index = len(self._entries)
+        self._entries.append((fingerprint, value))
+        for band in bands(fingerprint, self.threshold):
+            self._bands.setdefault(band, []).append(index)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def collapse_near_duplicates(items, index, key, label=None):
+    """Drop items whose key is a near-duplicate of anything already in `index`,
+    adding the survivors to it. Returns (kept, duplicates) where duplicates is a
+    list of (item, label_of_the_item_it_duplicates)."""
+    kept, duplicates = [], []
+    for item in items:
+        text = key(item)
+        if not text:
+            kept.append(item)
+            continue
+        fingerprint = simhash(normalize_title(text), shingle=2)
+        match = index.find(fingerprint)
+        if match is not None:
+            duplicates.append((item, match))
+            continue
+        index.add(fingerprint, label)
+        kept.append(item)
+    return kept, duplicates
@@ -0,0 +1,338 @@
+"""Headless batch summarizer.
+
+    python fetch.py data/sample_urls.txt -o data/summaries.jsonl
+    cat urls.txt | python fetch.py - -o data/summaries.jsonl --question "Who is affected?"
+
+URLs are read lazily (one per line, '#' comments allowed), queued per host and
+fetched concurrently within per-host politeness limits, then summarized by a
+bounded pool of LLM workers. --llm-workers caps the API requests open at once,
+including the per-section requests of long articles. Every finished URL is
+appended to the output JSONL immediately; rerunning with the same output file
+skips URLs that already succeeded for the same --question.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tomllib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from analyze import extract_article
+from http_cache import normalize_url
+from llm import DEFAULT_PARAMS, TogetherClient
+from result_cache import content_hash, get_result_cache
+from summarizer import summarize
+
+
+SECRETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml")
+
+
+def load_api_key():
+    if os.environ.get("TOGETHER_API_KEY"):
+        return os.environ["TOGETHER_API_KEY"]
+    try:
+        with open(SECRETS_PATH, "rb") as f:
+            return tomllib.load(f)["TOGETHER_API_KEY"]
+    except (OSError, KeyError, tomllib.TOMLDecodeError):
+        sys.exit("TOGETHER_API_KEY is not set and .streamlit/secrets.toml has no key")
+
+
+def read_urls(stream):
+    for line in stream:
+        url = line.strip()
+        if url and not url.startswith("#"):
+            yield url
+
+
+def load_checkpoint(path):
+    # the output file doubles as the checkpoint: any (URL, question) with an "ok"
+    # record is done, so rerunning with a new --question redoes every URL
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash
+            if record.get("status") == "ok":
+                done.add((normalize_url(record["url"]), record.get("question", "")))
+    return done
+
+
+class HostScheduler:
+    """Per-host queues in front of a worker pool. A URL is handed to `dispatch`
+    only when its host has fewer than `per_host` fetches running and its last
+    start was at least `delay` seconds ago, so a run of URLs for one host waits
+    in that host's queue while other hosts keep the workers busy.
+
+    At most `workers` fetches run at once, at most `capacity` dispatched URLs are
+    unfinished (fetched but not yet summarized), and `put` blocks once `backlog`
+    URLs are queued."""
+
+    def __init__(self, dispatch, per_host=2, delay=1.0, workers=16, capacity=24, backlog=1000):
+        self.dispatch = dispatch
+        self.per_host = per_host
+        self.delay = delay
+        self.workers = workers
+        self.capacity = capacity
+        self.backlog = backlog
+        self._cond = threading.Condition()
+        self._queues = {}  # host -> deque of items, in first-seen host order
+        self._active = {}  # host -> fetches running
+        self._next_start = {}
+        self._queued = self._running = self._in_flight = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def put(self, host, item):
+        with self._cond:
+            while self._queued >= self.backlog:
+                self._cond.wait()
+            self._queues.setdefault(host, deque()).append(item)
+            self._queued += 1
+            self._cond.notify_all()
+
+    def host_done(self, host):
+        # the fetch finished; the host may start another one
+        with self._cond:
+            self._active[host] -= 1
+            if not self._active[host]:
+                del self._active[host]
+            self._running -= 1
+            self._cond.notify_all()
+
+    def task_done(self):
+        # the URL's record was written
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def clear(self):
+        with self._cond:
+            dropped, self._queued = self._queued, 0
+            self._queues.clear()
+            self._cond.notify_all()
+            return dropped
+
+    def join(self):
+        with self._cond:
+            while self._queued or self._in_flight:
+                self._cond.wait()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        with self._cond:
+            while not self._closed:
+                self._cond.wait(self._dispatch_ready())
+
+    def _dispatch_ready(self):
+        # called with the lock held; returns how long until a throttled host is
+        # ready, or None to sleep until a put or a finished fetch
+        wait = None
+        dispatched = True
+        while dispatched:
+            dispatched = False
+            now = time.monotonic()
+            # one URL per ready host per pass, so hosts share the workers round-robin
+            for host in list(self._queues):
+                if self._running >= self.workers or self._in_flight >= self.capacity:
+                    return None
+                if self._active.get(host, 0) >= self.per_host:
+                    continue
+                start = self._next_start.get(host, now)
+                if start > now:
+                    wait = start - now if wait is None else min(wait, start - now)
+                    continue
+                queue = self._queues[host]
+                item = queue.popleft()
+                if not queue:
+                    del self._queues[host]
+                self._queued -= 1
+                self._running += 1
+                self._in_flight += 1
+                self._active[host] = self._active.get(host, 0) + 1
+                self._next_start[host] = now + self.delay
+                self.dispatch(host, item)
+                dispatched = True
+            if dispatched:
+                self._cond.notify_all()  # put() may be waiting for backlog room
+        return wait
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, "a+", encoding="utf-8")
+        # a crash mid-write can leave a line without its newline
+        if self._file.tell() > 0:
+            self._file.seek(self._file.tell() - 1)
+            if self._file.read(1) != "\n":
+                self._file.write("\n")
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.counts = {"ok": 0, "error": 0, "skipped": 0, "cached": 0}
+        self.latencies = {"fetch": [], "summarize": [], "total": []}
+
+    def record(self, status, **latencies):
+        with self._lock:
+            self.counts[status] += 1
+            for stage, value in latencies.items():
+                if value is not None:
+                    self.latencies[stage].append(value)
+
+    def report(self, out=sys.stderr):
+        elapsed = time.perf_counter() - self.started
+        processed = self.counts["ok"] + self.counts["error"]
+        print(
+            f"\n{processed} URLs in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.2f} URLs/s) · "
+            f"{self.counts['ok']} ok, {self.counts['error']} failed, {self.counts['skipped']} skipped, "
+            f"{self.counts['cached']} from result cache",
+            file=out,
+        )
+        for stage, values in self.latencies.items():
+            if not values:
+                continue
+            values = sorted(values)
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            print(
+                f"  {stage:<10} p50 {statistics.median(values):6.2f}s  p95 {p95:6.2f}s  max {values[-1]:6.2f}s",
+                file=out,
+            )
+
+
+class Pipeline:
+    def __init__(self, client, writer, question="", fetch_workers=16, llm_workers=4, per_host=2, host_delay=1.0):
+        self.client = client
+        self.writer = writer
+        self.question = question
+        self.stats = Stats()
+        self.fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="fetch")
+        self.llm_pool = ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="llm")
+        # capacity bounds fetched articles waiting for the LLM, so memory stays flat on huge inputs
+        self.scheduler = HostScheduler(
+            self._dispatch, per_host, host_delay, workers=fetch_workers, capacity=fetch_workers + llm_workers * 2,
+        )
+        self.result_cache = get_result_cache()
+
+    def submit(self, url):
+        self.scheduler.put(urlsplit(url).netloc.lower(), (url, time.perf_counter()))
+
+    def _dispatch(self, host, item):
+        self.fetch_pool.submit(self._fetch, host, *item)
+
+    def _finish(self, record, started, fetch=None, summarize_time=None):
+        record["timings"] = {"fetch": fetch, "summarize": summarize_time, "total": time.perf_counter() - started}
+        try:
+            self.writer.write(record)
+        finally:
+            self.stats.record(record["status"], fetch=fetch, summarize=summarize_time, total=record["timings"]["total"])
+            self.scheduler.task_done()
+            print(f"[{record['status']}] {record['url']}", file=sys.stderr)
+
+    def _fetch(self, host, url, started):
+        fetch_started = time.perf_counter()
+        try:
+            article = extract_article(url)
+        except Exception as e:
+            self._finish({"url": url, "status": "error", "error": f"fetch: {e}"}, started, fetch=time.perf_counter() - fetch_started)
+            return
+        finally:
+            self.scheduler.host_done(host)
+        self.llm_pool.submit(self._summarize, url, article, started, time.perf_counter() - fetch_started)
+
+    def _summarize(self, url, article, started, fetch_time):
+        record = {"url": url, "title": article.title, "question": self.question, "content_hash": content_hash(article.text)}
+        summarize_started = time.perf_counter()
+        try:
+            cached = self.result_cache.get(article.text, self.question, self.client.model, DEFAULT_PARAMS)
+            if cached:
+                record["summary"] = cached.result
+                record["cached"] = "near-duplicate" if cached.near_duplicate else "exact"
+                self.stats.record("cached")
+            else:
+                record["summary"] = "".join(summarize(self.client, article, self.question))
+                self.result_cache.put(article.text, self.question, self.client.model, DEFAULT_PARAMS, record["summary"], url=url)
+            record["status"] = "ok"
+        except Exception as e:
+            record.update(status="error", error=f"summarize: {e}")
+        self._finish(record, started, fetch=fetch_time, summarize_time=time.perf_counter() - summarize_started)
+
+    def close(self):
+        # fetch tasks schedule summarize tasks, so drain them in that order
+        self.scheduler.join()
+        self.scheduler.close()
+        self.fetch_pool.shutdown(wait=True)
+        self.llm_pool.shutdown(wait=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a list of article URLs into a JSONL file.")
+    parser.add_argument("input", nargs="?", default="data/sample_urls.txt", help="file with one URL per line, or - for stdin")
+    parser.add_argument("-o", "--output", default="data/summaries.jsonl")
+    parser.add_argument("-q", "--question", default="", help="question to answer for every article")
+    parser.add_argument("--fetch-workers", type=int, default=16)
+    parser.add_argument("--llm-workers", type=int, default=4, help="max concurrent LLM API requests")
+    parser.add_argument("--per-host", type=int, default=2, help="max concurrent requests per host")
+    parser.add_argument("--host-delay", type=float, default=1.0, help="min seconds between requests to one host")
+    args = parser.parse_args(argv)
+
+    done = load_checkpoint(args.output)
+    writer = JsonlWriter(args.output)
+    pipeline = Pipeline(
+        TogetherClient(load_api_key(), max_concurrent=args.llm_workers), writer, question=args.question,
+        fetch_workers=args.fetch_workers, llm_workers=args.llm_workers,
+        per_host=args.per_host, host_delay=args.host_delay,
+    )
+
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        for url in read_urls(stream):
+            key = (normalize_url(url), args.question)
+            if key in done:
+                pipeline.stats.record("skipped")
+                continue
+            done.add(key)
+            pipeline.submit(url)
+    except KeyboardInterrupt:
+        dropped = pipeline.scheduler.clear()
+        print(f"\ninterrupted; finishing in-flight URLs, {dropped} queued left for a rerun", file=sys.stderr)
+    finally:
+        pipeline.close()
+        writer.close()
+        if stream is not sys.stdin:
+            stream.close()
+        pipeline.stats.report()
+
+
+if __name__ == "__main__":
+    main()
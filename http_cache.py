@@ -0,0 +1,221 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read) seconds
+CACHE_DIR = os.environ.get("OPENLENS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+# query parameters that only track where a click came from and never change the page
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "guccounter", "ref_src")
+
+
+class FetchError(Exception):
+    pass
+
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "http").lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+# --- Pooled sessions, one per host ---
+
+# least recently used hosts are dropped past this, so a long batch over many
+# sites doesn't keep a connection pool open for every host it ever touched
+MAX_SESSIONS = 64
+
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+def get_session(url):
+    host = urlsplit(url).netloc.lower()
+    evicted = []
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[host] = session
+            while len(_sessions) > MAX_SESSIONS:
+                evicted.append(_sessions.popitem(last=False)[1])
+        else:
+            _sessions.move_to_end(host)
+    # closing only drops idle pooled connections; a request still running on an
+    # evicted session finishes normally
+    for old in evicted:
+        old.close()
+    return session
+
+
+# --- On-disk cache of extracted content ---
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    revalidated: int = 0
+    evictions: int = 0
+
+
+class FetchCache:
+    """Caches the *extracted* payload of a page, keyed by normalized URL.
+
+    Entries younger than `fresh_for` are served without touching the network;
+    older ones are revalidated with If-None-Match / If-Modified-Since so an
+    unchanged page costs a 304. Entries are evicted after `max_age` seconds or
+    once the cache grows past `max_bytes`, least recently used first."""
+
+    def __init__(self, path=None, fresh_for=15 * 60, max_age=7 * 24 * 3600, max_bytes=64 * 1024 * 1024):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "http_cache.sqlite3")
+        self.fresh_for = fresh_for
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)")
+
+    @staticmethod
+    def key(url, namespace=""):
+        return hashlib.sha256(f"{namespace}|{normalize_url(url)}".encode("utf-8")).hexdigest()
+
+    def get(self, url, namespace=""):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, etag, last_modified, fetched_at FROM pages WHERE key = ?",
+                (self.key(url, namespace),),
+            ).fetchone()
+        if row is None:
+            return None
+        payload, etag, last_modified, fetched_at = row
+        if time.time() - fetched_at > self.max_age:
+            return None
+        return {"payload": payload, "etag": etag, "last_modified": last_modified, "fetched_at": fetched_at}
+
+    def put(self, url, payload, etag=None, last_modified=None, namespace=""):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.key(url, namespace), normalize_url(url), payload, etag, last_modified, now, now, len(payload.encode("utf-8"))),
+            )
+        self.evict()
+
+    def touch(self, url, fetched=False, namespace=""):
+        key = self.key(url, namespace)
+        now = time.time()
+        with self._lock:
+            if fetched:
+                self._db.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            else:
+                self._db.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (now, key))
+
+    def evict(self):
+        with self._lock:
+            cur = self._db.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.max_age,))
+            evicted = cur.rowcount
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in self._db.execute("SELECT key, size FROM pages ORDER BY accessed_at").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._db.execute("DELETE FROM pages WHERE key = ?", (key,))
+                    total -= size
+                    evicted += 1
+            self.stats.evictions += evicted
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM pages")
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = FetchCache()
+        return _default_cache
+
+
+def fetch_cached(url, extract, namespace="", cache=None, timeout=DEFAULT_TIMEOUT):
+    """Return `extract(response)` for `url`, going through the on-disk cache.
+
+    `extract` receives a streamed requests.Response and must return a str; that
+    string is what gets cached, so repeat views skip both download and parsing.
+    Callers with different extractors must use different `namespace`s."""
+    cache = cache or get_cache()
+    entry = cache.get(url, namespace)
+
+    if entry and time.time() - entry["fetched_at"] <= cache.fresh_for:
+        cache.stats.hits += 1
+        cache.touch(url, namespace=namespace)
+        return entry["payload"]
+
+    headers = {}
+    if entry:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response = get_session(url).get(url, headers=headers, timeout=timeout, stream=True)
+    except requests.RequestException as e:
+        raise FetchError(f"Error fetching content: {e}") from e
+
+    with response:
+        if response.status_code == 304 and entry:
+            cache.stats.hits += 1
+            cache.stats.revalidated += 1
+            cache.touch(url, fetched=True, namespace=namespace)
+            return entry["payload"]
+        if response.status_code != 200:
+            raise FetchError(f"Failed to fetch article: {response.status_code}")
+
+        cache.stats.misses += 1
+        payload = extract(response)
+
+    cache.put(url, payload, etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"), namespace=namespace)
+    return payload
@@ -0,0 +1,170 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+API_URL = os.environ.get("OPENLENS_LLM_API_URL", "https://api.together.xyz/v1/chat/completions")
+MODEL = "meta-llama/Llama-3-70b-chat-hf"
+DEFAULT_PARAMS = {"temperature": 0.7, "top_p": 0.9, "max_tokens": 1024}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    pass
+
+
+@dataclass
+class CompletionStats:
+    started: float = field(default_factory=time.perf_counter)
+    first_token_at: float = None
+    finished_at: float = None
+    tokens: int = 0
+    attempts: int = 0
+
+    @property
+    def ttft(self):
+        return None if self.first_token_at is None else self.first_token_at - self.started
+
+    @property
+    def total(self):
+        return None if self.finished_at is None else self.finished_at - self.started
+
+    @property
+    def tokens_per_sec(self):
+        if self.first_token_at is None or self.finished_at is None or self.finished_at <= self.first_token_at:
+            return None
+        return self.tokens / (self.finished_at - self.first_token_at)
+
+    def summary(self):
+        parts = []
+        if self.ttft is not None:
+            parts.append(f"first token {self.ttft:.2f}s")
+        if self.tokens_per_sec is not None:
+            parts.append(f"{self.tokens_per_sec:.1f} tok/s")
+        if self.total is not None:
+            parts.append(f"total {self.total:.2f}s")
+        if self.attempts > 1:
+            parts.append(f"{self.attempts} attempts")
+        return " · ".join(parts)
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TogetherClient:
+    """Chat-completions client for the Together API (or anything speaking the
+    same OpenAI-style protocol, e.g. a local fake server via `api_url`).
+    `max_concurrent` caps requests in flight across every thread using it."""
+
+    def __init__(self, api_key, api_url=API_URL, model=MODEL, max_retries=4, backoff=0.5, max_backoff=20.0, timeout=(5, 60), max_concurrent=None):
+        self.api_url = api_url
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _delay(self, attempt, response=None):
+        retry_after = _retry_after(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, 60.0)
+        # full jitter: uniform over [0, backoff * 2^attempt]
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _post(self, payload, stats, stream):
+        for attempt in range(self.max_retries + 1):
+            stats.attempts += 1
+            try:
+                response = self.session.post(
+                    self.api_url, data=json.dumps(payload), timeout=self.timeout, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise LLMError(f"API request failed: {e}") from e
+                time.sleep(self._delay(attempt))
+                continue
+
+            if response.status_code == 200:
+                return response
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._delay(attempt, response)
+                response.close()
+                time.sleep(delay)
+                continue
+            raise LLMError(f"API Error {response.status_code}: {response.text}")
+
+    def stream_chat(self, messages, stats=None, **params):
+        """Yield completion text as it arrives over server-sent events.
+
+        Retries only happen before the first byte of the body, so a consumer
+        never sees duplicated output. Pass a CompletionStats to collect timings."""
+        stats = stats if stats is not None else CompletionStats()
+        # held for the whole stream, so `max_concurrent` bounds requests actually open
+        with self._slots or nullcontext():
+            payload = {"model": self.model, "messages": messages, **DEFAULT_PARAMS, **params, "stream": True}
+            response = self._post(payload, stats, stream=True)
+            response.encoding = "utf-8"
+            usage_tokens = None
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or line.startswith(":") or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        event = json.loads(data)
+                    except ValueError:
+                        continue
+                    if "error" in event:
+                        error = event["error"]
+                        raise LLMError(f"API Error: {error.get('message', error) if isinstance(error, dict) else error}")
+                    if event.get("usage"):
+                        usage_tokens = event["usage"].get("completion_tokens", usage_tokens)
+                    choices = event.get("choices") or [{}]
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if not delta:
+                        continue
+                    if stats.first_token_at is None:
+                        stats.first_token_at = time.perf_counter()
+                    stats.tokens += 1
+                    yield delta
+            except requests.RequestException as e:
+                raise LLMError(f"Stream interrupted: {e}") from e
+            finally:
+                stats.finished_at = time.perf_counter()
+                if usage_tokens:
+                    stats.tokens = usage_tokens
+                response.close()
+
+    def chat(self, messages, stats=None, **params):
+        stats = stats if stats is not None else CompletionStats()
+        return "".join(self.stream_chat(messages, stats=stats, **params)), stats
@@ -0,0 +1,143 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+
+from http_cache import CACHE_DIR
+
+
+DEFAULT_RETENTION = int(os.environ.get("OPENLENS_HISTORY_RETENTION", "1000"))
+
+
+@dataclass
+class HistoryEntry:
+    id: int
+    created_at: float
+    url: str
+    question: str
+    summary: str = None
+    timings: dict = field(default_factory=dict)
+    content_hash: str = None
+
+
+def _match_query(text):
+    # quote every term so user input can't inject FTS5 syntax; prefix-match the last one
+    terms = ['"' + term.replace('"', '""') + '"' for term in text.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class HistoryStore:
+    """Summaries of past analyses in SQLite, with an FTS5 index over the URL,
+    question and summary. Only the newest `retention` entries are kept."""
+
+    def __init__(self, path=None, retention=DEFAULT_RETENTION):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "history.sqlite3")
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                url TEXT NOT NULL,
+                question TEXT NOT NULL DEFAULT '',
+                summary TEXT NOT NULL,
+                timings TEXT,
+                content_hash TEXT
+            );
+            CREATE INDEX IF NOT EXISTS history_content_hash ON history (content_hash);
+            CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                url, question, summary, content='history', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN
+                INSERT INTO history_fts (rowid, url, question, summary)
+                VALUES (new.id, new.url, new.question, new.summary);
+            END;
+            CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN
+                INSERT INTO history_fts (history_fts, rowid, url, question, summary)
+                VALUES ('delete', old.id, old.url, old.question, old.summary);
+            END;
+            """
+        )
+
+    def add(self, url, question, summary, timings=None, content_hash=None):
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                cur = self._db.execute(
+                    "INSERT INTO history (created_at, url, question, summary, timings, content_hash) VALUES (?, ?, ?, ?, ?, ?)",
+                    (time.time(), url, question or "", summary, json.dumps(timings or {}), content_hash),
+                )
+                if self.retention:
+                    self._db.execute(
+                        "DELETE FROM history WHERE id <= (SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (self.retention,),
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                # otherwise the shared connection stays mid-transaction and every later add fails
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                raise
+            return cur.lastrowid
+
+    def count(self, search=""):
+        with self._lock:
+            if search.strip():
+                return self._db.execute(
+                    "SELECT COUNT(*) FROM history_fts WHERE history_fts MATCH ?", (_match_query(search),)
+                ).fetchone()[0]
+            return self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def page(self, offset=0, limit=10, search=""):
+        """Newest-first (or best-match-first when searching) entries without their summaries."""
+        with self._lock:
+            if search.strip():
+                rows = self._db.execute(
+                    """SELECT h.id, h.created_at, h.url, h.question FROM history_fts
+                       JOIN history h ON h.id = history_fts.rowid
+                       WHERE history_fts MATCH ? ORDER BY bm25(history_fts), h.id DESC LIMIT ? OFFSET ?""",
+                    (_match_query(search), limit, offset),
+                ).fetchall()
+            else:
+                rows = self._db.execute(
+                    "SELECT id, created_at, url, question FROM history ORDER BY id DESC LIMIT ? OFFSET ?",
+                    (limit, offset),
+                ).fetchall()
+        return [HistoryEntry(*row) for row in rows]
+
+    def get(self, entry_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, created_at, url, question, summary, timings, content_hash FROM history WHERE id = ?",
+                (entry_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        entry = HistoryEntry(*row)
+        entry.timings = json.loads(entry.timings or "{}")
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM history")
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_history_store():
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = HistoryStore()
+        return _default_store
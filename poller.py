@@ -0,0 +1,299 @@
+"""Background feed poller.
+
+    python poller.py --interval 300
+
+Polls NewsAPI, the RSS feeds and Reddit on a schedule and appends only items it
+has not seen before to a Parquet store under data/feeds/, which visualize.py
+reads for the trend dashboard. NewsAPI is polled at most every NEWS_INTERVAL
+seconds whatever --interval is, to stay within its free plan's 100 requests/day. RSS feeds are fetched with conditional GETs (ETag /
+Last-Modified), and every item is de-duplicated by a hash of its source and URL.
+"""
+import argparse
+import calendar
+import glob
+import hashlib
+import os
+import sys
+import threading
+import time
+import tomllib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from http_cache import get_session
+from web_fetcher import _newsapi_client, _using_reddit
+
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "feeds")
+SECRETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml")
+DEFAULT_INTERVAL = 300
+# 48 requests/day, leaving room under NewsAPI's 100/day for the explorer's own fetches
+NEWS_INTERVAL = 1800
+REQUEST_TIMEOUT = (5, 20)
+RSS_FEEDS = {"stocks": "https://finance.yahoo.com/news/rssindex"}
+SUBREDDITS = ("technology",)
+# merge part files once there are this many, so reads stay a handful of files
+COMPACT_AFTER = 32
+
+COLUMNS = ["item_id", "source", "title", "url", "published_at", "fetched_at"]
+
+
+def item_id(source, url, title):
+    return hashlib.blake2b(f"{source}|{url or title}".encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _utc(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc) if timestamp else None
+
+
+def _stamp(path):
+    return int(os.path.basename(path).split("-", 1)[1].split(".", 1)[0])
+
+
+class FeedStore:
+    """Append-only Parquet store: each poll that finds new items writes one
+    part file; parts are periodically compacted into one.
+
+    A compacted file is named after the newest part it contains, so readers
+    (possibly another process) only ever read the newest compacted file plus the
+    parts written after it, and never see a part both merged and on its own."""
+
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.path, "*.parquet")))
+
+    def _snapshot(self):
+        files = self._parts()
+        compacted = [f for f in files if os.path.basename(f).startswith("compacted-")]
+        if not compacted:
+            return files
+        cutoff = _stamp(compacted[-1])
+        return [compacted[-1]] + [f for f in files if os.path.basename(f).startswith("part-") and _stamp(f) > cutoff]
+
+    def read(self, columns=None):
+        for attempt in range(3):
+            files = self._snapshot()
+            if not files:
+                return pd.DataFrame(columns=columns or COLUMNS)
+            try:
+                return pd.concat([pd.read_parquet(f, columns=columns) for f in files], ignore_index=True)
+            except FileNotFoundError:
+                # a compaction finished and removed what we listed; the next snapshot has its output
+                if attempt == 2:
+                    raise
+
+    def version(self):
+        # changes whenever a part is written or compacted; used as a cache key by the dashboard
+        return tuple(os.path.basename(f) for f in self._snapshot())
+
+    def seen_ids(self):
+        return set(self.read(columns=["item_id"])["item_id"])
+
+    def append(self, items):
+        if not items:
+            return 0
+        frame = pd.DataFrame(items, columns=COLUMNS)
+        frame["source"] = frame["source"].astype("category")
+        for column in ("published_at", "fetched_at"):
+            frame[column] = pd.to_datetime(frame[column], utc=True)
+        with self._lock:
+            target = os.path.join(self.path, f"part-{time.time_ns()}.parquet")
+            frame.to_parquet(target + ".tmp", index=False, compression="zstd")
+            os.replace(target + ".tmp", target)
+        return len(frame)
+
+    def compact_if_needed(self):
+        # separate from append: once a part is written its items are stored, even
+        # if merging the parts afterwards fails
+        with self._lock:
+            if len(self._snapshot()) >= COMPACT_AFTER:
+                self._compact()
+
+    def _compact(self):
+        files = self._snapshot()
+        cutoff = max(_stamp(f) for f in files)
+        merged = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+        merged["source"] = merged["source"].astype("category")
+        target = os.path.join(self.path, f"compacted-{cutoff}.parquet")
+        merged.to_parquet(target + ".tmp", index=False, compression="zstd")
+        os.replace(target + ".tmp", target)
+        # also sweeps files left behind by a compaction that was interrupted
+        for f in self._parts():
+            if f != target and _stamp(f) <= cutoff:
+                try:
+                    os.remove(f)
+                except FileNotFoundError:
+                    pass
+
+
+@dataclass
+class PollStatus:
+    last_poll: float = None
+    new_items: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+    polls: int = 0
+
+
+class FeedPoller:
+    def __init__(self, secrets, store=None, interval=DEFAULT_INTERVAL, rss_feeds=RSS_FEEDS, subreddits=SUBREDDITS, news_interval=NEWS_INTERVAL):
+        self.secrets = secrets
+        self.store = store or FeedStore()
+        self.interval = interval
+        self.news_interval = news_interval
+        self._news_polled_at = None
+        self.rss_feeds = dict(rss_feeds)
+        self.subreddits = tuple(subreddits)
+        self.status = PollStatus()
+        self._seen = self.store.seen_ids()
+        self._rss_validators = {}  # feed name -> (etag, modified)
+        self._poll_lock = threading.Lock()  # "Poll now" in the UI can race the background thread
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _new(self, source, title, url, published_at, now):
+        # only marked seen once the store write succeeds, in _poll
+        key = item_id(source, url, title)
+        if key in self._seen:
+            return None
+        return {"item_id": key, "source": source, "title": title, "url": url, "published_at": published_at or now, "fetched_at": now}
+
+    def _poll_news(self, now):
+        api_key = self.secrets.get("newsapi")
+        if not api_key:
+            return []
+        response = _newsapi_client(api_key).get_top_headlines(q="technology", language="en", page_size=100)
+        items = []
+        for article in response["articles"]:
+            published = pd.to_datetime(article.get("publishedAt"), utc=True, errors="coerce")
+            items.append(self._new("news", article["title"], article["url"], None if pd.isna(published) else published.to_pydatetime(), now))
+        return items
+
+    def _poll_rss(self, name, url, now):
+        """New items plus the feed's (etag, modified), or None on a 304. The caller
+        saves the validators only once the items are stored: otherwise a failed
+        write would be followed by a 304 and those items never ingested."""
+        import feedparser
+
+        # conditional GET through requests rather than feedparser.parse(url, etag=...),
+        # which has no timeout and could wedge the poller thread
+        etag, modified = self._rss_validators.get(name, (None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+        response = get_session(url).get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            return [], None
+        response.raise_for_status()
+        validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        feed = feedparser.parse(response.content)
+        items = []
+        for entry in feed.entries:
+            published = entry.get("published_parsed") or entry.get("updated_parsed")
+            items.append(self._new(name, entry.get("title", ""), entry.get("link"), _utc(calendar.timegm(published)) if published else None, now))
+        return items, validators
+
+    def _poll_reddit(self, subreddit, now):
+        reddit = self.secrets.get("reddit")
+        if not reddit:
+            return []
+        # no `before` cursor: it returns nothing once that post is deleted, and the
+        # newest 100 are a single request that item_id de-duplication already filters
+        with _using_reddit(reddit["client_id"], reddit["client_secret"], reddit["user_agent"]) as client:
+            posts = client.subreddit(subreddit).new(limit=100)
+            return [self._new("reddit", post.title, post.url, _utc(post.created_utc), now) for post in posts]
+
+    def poll_once(self):
+        with self._poll_lock:
+            return self._poll()
+
+    def _poll(self):
+        now = datetime.now(timezone.utc)
+        jobs = {}
+        # counted from the attempt, not a success, so a failing key isn't retried every poll
+        if self._news_polled_at is None or time.monotonic() - self._news_polled_at >= self.news_interval:
+            self._news_polled_at = time.monotonic()
+            jobs["news"] = lambda: self._poll_news(now)
+        validators = {}
+
+        def poll_rss(name, url):
+            items, validators[name] = self._poll_rss(name, url, now)
+            return items
+
+        for name, url in self.rss_feeds.items():
+            jobs[name] = lambda name=name, url=url: poll_rss(name, url)
+        for subreddit in self.subreddits:
+            jobs[f"reddit/{subreddit}"] = lambda subreddit=subreddit: self._poll_reddit(subreddit, now)
+
+        new_items, errors = {}, {}
+        counts = {}
+        for name, job in jobs.items():
+            try:
+                items = job()
+            except Exception as e:
+                errors[name] = str(e)
+                continue
+            counts[name] = 0
+            for item in items:
+                if item and item["item_id"] not in new_items:
+                    new_items[item["item_id"]] = item
+                    counts[name] += 1
+
+        try:
+            self.store.append(list(new_items.values()))
+        except Exception as e:
+            # nothing was stored, so the same items count as new on the next poll
+            errors["store"] = str(e)
+            counts = {name: 0 for name in counts}
+        else:
+            self._seen.update(new_items)
+            self._rss_validators.update((name, value) for name, value in validators.items() if value)
+            try:
+                self.store.compact_if_needed()
+            except Exception as e:
+                errors["compact"] = str(e)
+        self.status = PollStatus(time.time(), counts, errors, self.status.polls + 1)
+        return self.status
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll_once()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="feed-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poll the news, RSS and Reddit feeds into data/feeds/.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between polls")
+    parser.add_argument("--once", action="store_true", help="poll a single time and exit")
+    args = parser.parse_args(argv)
+
+    with open(SECRETS_PATH, "rb") as f:
+        secrets = tomllib.load(f)
+    poller = FeedPoller(secrets, interval=args.interval)
+    while True:
+        status = poller.poll_once()
+        print(f"{datetime.now():%H:%M:%S} new items: {status.new_items} errors: {status.errors}", file=sys.stderr)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
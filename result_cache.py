@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from dedup import DEFAULT_THRESHOLD, bands, hamming, normalize_text, simhash
+from http_cache import CACHE_DIR
+
+
+@dataclass
+class CachedResult:
+    result: str
+    url: str
+    near_duplicate: bool
+    distance: int = 0
+
+
+def content_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _params_key(question, model, params):
+    blob = json.dumps({"question": question.strip(), "model": model, "params": params}, sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class ResultCache:
+    """Persistent cache of LLM results keyed by article content, not URL.
+
+    An exact hit needs the same normalized article text, question, model and
+    sampling params. Failing that, an article whose SimHash is within
+    `threshold` bits of a cached one (the same wire story syndicated under a
+    different URL) reuses that result. Entries are evicted by age and by total
+    size, least recently used first."""
+
+    def __init__(self, path=None, threshold=DEFAULT_THRESHOLD, max_age=30 * 24 * 3600, max_bytes=32 * 1024 * 1024):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "results.sqlite3")
+        self.threshold = threshold
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                params_key TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                simhash INTEGER NOT NULL,
+                url TEXT,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at);
+            CREATE TABLE IF NOT EXISTS result_bands (
+                params_key TEXT NOT NULL,
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                key TEXT NOT NULL REFERENCES results (key) ON DELETE CASCADE
+            );
+            CREATE INDEX IF NOT EXISTS result_bands_lookup ON result_bands (params_key, band, value);
+            """
+        )
+        self._db.execute("PRAGMA foreign_keys=ON")
+
+    def get(self, text, question, model, params):
+        params_key = _params_key(question, model, params)
+        digest = content_hash(text)
+        key = hashlib.sha256(f"{params_key}|{digest}".encode("utf-8")).hexdigest()
+        oldest = time.time() - self.max_age
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result, url FROM results WHERE key = ? AND created_at >= ?", (key, oldest)
+            ).fetchone()
+            if row:
+                self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                return CachedResult(row[0], row[1], near_duplicate=False)
+
+            fingerprint = simhash(text)
+            band_filter = " OR ".join("(b.band = ? AND b.value = ?)" for _ in bands(fingerprint, self.threshold))
+            args = [value for band in bands(fingerprint, self.threshold) for value in band]
+            candidates = self._db.execute(
+                f"""SELECT DISTINCT r.key, r.simhash, r.result, r.url FROM result_bands b
+                    JOIN results r ON r.key = b.key
+                    WHERE b.params_key = ? AND ({band_filter}) AND r.created_at >= ?""",
+                [params_key, *args, oldest],
+            ).fetchall()
+            best = None
+            for candidate_key, other, result, url in candidates:
+                distance = hamming(fingerprint, other & ((1 << 64) - 1))
+                if distance <= self.threshold and (best is None or distance < best[0]):
+                    best = (distance, candidate_key, result, url)
+            if best is None:
+                return None
+            self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), best[1]))
+            return CachedResult(best[2], best[3], near_duplicate=True, distance=best[0])
+
+    def put(self, text, question, model, params, result, url=None):
+        params_key = _params_key(question, model, params)
+        digest = content_hash(text)
+        key = hashlib.sha256(f"{params_key}|{digest}".encode("utf-8")).hexdigest()
+        fingerprint = simhash(text)
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("DELETE FROM result_bands WHERE key = ?", (key,))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, params_key, digest, _signed(fingerprint), url, result, now, now, len(result.encode("utf-8"))),
+                )
+                self._db.executemany(
+                    "INSERT INTO result_bands VALUES (?, ?, ?, ?)",
+                    [(params_key, band, value, key) for band, value in bands(fingerprint, self.threshold)],
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                # leave the shared connection usable, e.g. after "database is locked"
+                # while fetch.py writes the same file
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                raise
+        self.evict()
+
+    def evict(self):
+        with self._lock:
+            self._db.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.max_age,))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed_at").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    total -= size
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
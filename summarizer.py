@@ -0,0 +1,267 @@
+import math
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from analyze import HEADING_TAGS
+from llm import DEFAULT_PARAMS
+
+
+# articles under this many prompt tokens go to the model in one request
+SINGLE_PASS_TOKENS = 3000
+CHUNK_TOKENS = 1200
+MAP_MAX_TOKENS = 200
+MAP_WORKERS = 4
+# how much raw article text question answering may include alongside the section summaries
+QA_CONTEXT_TOKENS = 1800
+# Llama-3-70b's context window; the reduce prompt plus its completion must fit in it,
+# with some slack because estimate_tokens is only approximate
+CONTEXT_TOKENS = 8192
+PROMPT_MARGIN = 512
+REDUCE_PROMPT_TOKENS = CONTEXT_TOKENS - DEFAULT_PARAMS["max_tokens"] - PROMPT_MARGIN
+# notes are merged in groups of about this many tokens when they don't fit the reduce prompt
+CONDENSE_GROUP_TOKENS = 1200
+
+SYSTEM_PROMPT = (
+    "You are an expert research assistant. "
+    "Summarize news articles clearly and answer user questions precisely using only the article content. Avoid speculation. "
+    "Have a sarcastic tone when appropriate, but always be helpful. "
+    "If the user asks for your opinion, make it funny and engaging."
+)
+
+_WORD_RE = re.compile(r"\w+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "does", "for", "from", "how", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "what", "when", "where",
+    "which", "who", "why", "will", "with", "about", "article", "they", "their", "there",
+}
+
+
+def estimate_tokens(text):
+    # Llama tokenizers average roughly four characters per token on English prose
+    return math.ceil(len(text) / 4)
+
+
+@dataclass
+class Chunk:
+    index: int
+    blocks: list = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def text(self):
+        return "\n".join(text for _, text in self.blocks)
+
+
+def _split_long_block(tag, text, max_tokens):
+    pieces, current = [], ""
+    for sentence in _SENTENCE_RE.split(text):
+        if current and estimate_tokens(current + " " + sentence) > max_tokens:
+            pieces.append((tag, current))
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append((tag, current))
+    return pieces
+
+
+def chunk_blocks(blocks, max_tokens=CHUNK_TOKENS):
+    """Group (tag, text) blocks into chunks of at most ~max_tokens, preferring to
+    break before a heading once a chunk is at least half full."""
+    chunks = [Chunk(0)]
+    for tag, text in blocks:
+        for piece in _split_long_block(tag, text, max_tokens) if estimate_tokens(text) > max_tokens else [(tag, text)]:
+            tokens = estimate_tokens(piece[1])
+            current = chunks[-1]
+            full = current.tokens + tokens > max_tokens
+            section_break = piece[0] in HEADING_TAGS and current.tokens >= max_tokens // 2
+            if current.blocks and (full or section_break):
+                current = Chunk(len(chunks))
+                chunks.append(current)
+            current.blocks.append(piece)
+            current.tokens += tokens
+    return [chunk for chunk in chunks if chunk.blocks]
+
+
+def _terms(text):
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+def rank_chunks(chunks, question):
+    """Order chunks by BM25 relevance to `question`."""
+    query = set(_terms(question))
+    if not query:
+        return []
+    docs = [Counter(_terms(chunk.text)) for chunk in chunks]
+    avg_len = sum(sum(doc.values()) for doc in docs) / len(docs) or 1
+    df = Counter(term for doc in docs for term in query if term in doc)
+    k1, b = 1.5, 0.75
+
+    def score(doc):
+        length = sum(doc.values())
+        total = 0.0
+        for term in query:
+            tf = doc.get(term, 0)
+            if tf:
+                idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+                total += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_len))
+        return total
+
+    scored = [(score(doc), chunk) for doc, chunk in zip(docs, chunks)]
+    return [chunk for value, chunk in sorted(scored, key=lambda pair: -pair[0]) if value > 0]
+
+
+def select_relevant(chunks, question, budget=QA_CONTEXT_TOKENS):
+    selected, used = [], 0
+    for chunk in rank_chunks(chunks, question):
+        if used + chunk.tokens > budget:
+            continue
+        selected.append(chunk)
+        used += chunk.tokens
+    return sorted(selected, key=lambda chunk: chunk.index)
+
+
+def _question_line(query):
+    return f"**Question**: {query if query.strip() else 'No question was asked'}"
+
+
+def build_messages(article_text, query):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": f"""Here's an article I want you to analyze:
+
+{article_text}
+
+Now, follow these steps:
+1. Give a concise **summary** of the article.
+2. If the following question is provided, answer it using only the article content:
+
+{_question_line(query)}
+
+Begin your response below:
+"""
+        }
+    ]
+
+
+def build_map_messages(chunk, total, title):
+    return [
+        {"role": "system", "content": "You condense one section of a news article into 2-4 factual bullet points. No commentary."},
+        {
+            "role": "user",
+            "content": f"Article: {title or 'untitled'}\nSection {chunk.index + 1} of {total}:\n\n{chunk.text}\n\nBullet points:",
+        },
+    ]
+
+
+def build_condense_messages(notes, first, total, title):
+    sections = "\n\n".join(notes)
+    return [
+        {"role": "system", "content": "You merge notes on consecutive sections of a news article into 3-5 factual bullet points. No commentary."},
+        {
+            "role": "user",
+            "content": f"Article: {title or 'untitled'}\nNotes on sections {first + 1}-{first + len(notes)} of {total}:\n\n{sections}\n\nBullet points:",
+        },
+    ]
+
+
+def message_tokens(messages):
+    # a few tokens per message for the chat template's role markers
+    return sum(estimate_tokens(message["content"]) + 4 for message in messages)
+
+
+def group_notes(notes, max_tokens=CONDENSE_GROUP_TOKENS):
+    """Split notes into consecutive groups of ~max_tokens, at least two notes each
+    so every condense stage shrinks the list."""
+    groups, current, used = [], [], 0
+    for note in notes:
+        tokens = estimate_tokens(note)
+        if len(current) >= 2 and used + tokens > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(note)
+        used += tokens
+    if len(current) == 1 and groups:
+        groups[-1].extend(current)
+    elif current:
+        groups.append(current)
+    return groups
+
+
+def build_reduce_messages(title, section_summaries, excerpts, query):
+    sections = "\n\n".join(f"Section {i + 1}:\n{summary}" for i, summary in enumerate(section_summaries))
+    context = ""
+    if excerpts:
+        context = "\n\nRelevant excerpts from the full article:\n\n" + "\n\n".join(chunk.text for chunk in excerpts)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": f"""Here are section-by-section notes on a long article{f' titled "{title}"' if title else ''}:
+
+{sections}{context}
+
+Now, follow these steps:
+1. Give a concise **summary** of the whole article based on these notes.
+2. If the following question is provided, answer it using only the notes and excerpts:
+
+{_question_line(query)}
+
+Begin your response below:
+"""
+        }
+    ]
+
+
+def summarize(client, article, query, stats=None, on_progress=None):
+    """Stream a summary (and answer) for an analyze.Article.
+
+    Short articles are sent whole. Longer ones are chunked on heading/paragraph
+    boundaries, each chunk is summarized in parallel (at most MAP_WORKERS
+    requests in flight), and the final streamed answer is built from those notes
+    plus only the chunks most relevant to the question. When there are too many
+    notes for the reduce prompt they are first merged in groups, repeatedly if
+    needed, so the prompt stays within REDUCE_PROMPT_TOKENS."""
+    text = article.text
+    if estimate_tokens(text) <= SINGLE_PASS_TOKENS:
+        yield from client.stream_chat(build_messages(text, query), stats=stats)
+        return
+
+    chunks = chunk_blocks(article.blocks)
+
+    def complete(messages):
+        summary, _ = client.chat(messages, max_tokens=MAP_MAX_TOKENS, temperature=0.2)
+        return summary.strip()
+
+    summaries = _map_in_order(complete, [build_map_messages(chunk, len(chunks), article.title) for chunk in chunks], on_progress)
+    excerpts = select_relevant(chunks, query) if query.strip() else []
+
+    # very long articles produce more notes than fit next to the excerpts: merge
+    # neighbouring notes in stages until the reduce prompt is within budget
+    while len(summaries) > 1 and message_tokens(build_reduce_messages(article.title, summaries, excerpts, query)) > REDUCE_PROMPT_TOKENS:
+        groups, first, prompts = group_notes(summaries), 0, []
+        for group in groups:
+            prompts.append(build_condense_messages(group, first, len(summaries), article.title))
+            first += len(group)
+        summaries = _map_in_order(complete, prompts, on_progress)
+    if message_tokens(build_reduce_messages(article.title, summaries, excerpts, query)) > REDUCE_PROMPT_TOKENS:
+        excerpts = []
+    yield from client.stream_chat(build_reduce_messages(article.title, summaries, excerpts, query), stats=stats)
+
+
+def _map_in_order(fn, items, on_progress=None):
+    results = [None] * len(items)
+    done = 0
+    with ThreadPoolExecutor(max_workers=MAP_WORKERS, thread_name_prefix="map") as executor:
+        futures = {executor.submit(fn, item): index for index, item in enumerate(items)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            done += 1
+            if on_progress:
+                on_progress(done, len(items))
+    return results
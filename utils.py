@@ -1,12 +1,8 @@
-import requests
-from bs4 import BeautifulSoup
+from analyze import extract_article
+
 
 def extract_text_from_url(url):
     try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        paragraphs = soup.find_all("p")
-        text = " ".join([p.get_text() for p in paragraphs])
-        return text
+        return " ".join(extract_article(url).paragraphs)
     except Exception as e:
         return f"Error: {e}"
@@ -0,0 +1,84 @@
+import pandas as pd
+
+from poller import FeedStore
+
+
+# candidate bucket sizes, finest first; the finest one that keeps a series under
+# MAX_POINTS buckets is used, so long histories are downsampled before plotting
+FREQUENCIES = ["5min", "15min", "30min", "1h", "3h", "6h", "12h", "1D", "7D", "30D"]
+MAX_POINTS = 400
+TOP_KEYWORDS = 8
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "has", "have", "its", "into", "over",
+    "after", "about", "your", "you", "new", "will", "says", "how", "why", "what", "who", "can", "not", "but",
+    "more", "than", "out", "off", "all", "now", "just", "get", "amid", "his", "her", "they", "their", "our",
+    "com", "www", "http", "https",
+}
+
+
+def load_items(store=None, since=None):
+    store = store or FeedStore()
+    frame = store.read(columns=["source", "title", "published_at"])
+    if frame.empty:
+        return frame
+    frame["published_at"] = pd.to_datetime(frame["published_at"], utc=True)
+    frame["source"] = frame["source"].astype("category")
+    if since is not None:
+        frame = frame[frame["published_at"] >= since]
+    return frame
+
+
+def choose_frequency(frame, max_points=MAX_POINTS):
+    if frame.empty:
+        return FREQUENCIES[0]
+    span = frame["published_at"].max() - frame["published_at"].min()
+    for freq in FREQUENCIES:
+        if span / pd.Timedelta(freq) <= max_points:
+            return freq
+    return FREQUENCIES[-1]
+
+
+def source_volume(frame, freq=None):
+    """Items per time bucket, one column per source."""
+    freq = freq or choose_frequency(frame)
+    if frame.empty:
+        return pd.DataFrame()
+    return (
+        frame.groupby([pd.Grouper(key="published_at", freq=freq), "source"], observed=True)
+        .size()
+        .unstack("source", fill_value=0)
+        .asfreq(freq, fill_value=0)
+    )
+
+
+def title_words(frame):
+    """One row per (item, distinct word in its title), indexed like `frame`."""
+    words = frame["title"].str.lower().str.findall(r"[a-z][a-z0-9+&'-]{2,}").explode().dropna()
+    words = words[~words.isin(STOPWORDS)]
+    # count a word once per title even if it repeats
+    pairs = words.rename("word").rename_axis("row").reset_index().drop_duplicates()
+    return pairs.set_index("row")["word"]
+
+
+def top_keywords(frame, n=TOP_KEYWORDS, words=None):
+    if frame.empty:
+        return []
+    words = title_words(frame) if words is None else words
+    return words.value_counts().head(n).index.tolist()
+
+
+def keyword_volume(frame, keywords, freq=None, words=None):
+    """Items per time bucket whose title mentions each keyword, one column per keyword."""
+    freq = freq or choose_frequency(frame)
+    if frame.empty or not keywords:
+        return pd.DataFrame()
+    words = title_words(frame) if words is None else words
+    words = words[words.isin([keyword.lower() for keyword in keywords])]
+    hits = pd.DataFrame({"word": words.values, "published_at": frame["published_at"].reindex(words.index).values})
+    return (
+        hits.groupby([pd.Grouper(key="published_at", freq=freq), "word"])
+        .size()
+        .unstack("word", fill_value=0)
+        .reindex(columns=[keyword.lower() for keyword in keywords], fill_value=0)
+        .asfreq(freq, fill_value=0)
+    )
@@ -1,26 +1,80 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+
 import requests
-import feedparser
 
-import praw
-import streamlit as st
-from newsapi import NewsApiClient
-import tweepy
+# praw, newsapi and feedparser are imported inside the functions that use them:
+# Streamlit imports this module on every cold start, and most reruns never fetch a feed.
+
+
+DEFAULT_TIMEOUT = 10
+# how long a feed result is reused before a source is queried again
+DEFAULT_TTL = 120
+# how long a failure or timeout is reported before retrying, so Streamlit reruns
+# (any widget interaction) don't re-query a broken source and strand another thread
+ERROR_TTL = 30
+
+
+@lru_cache(maxsize=None)
+def _newsapi_client(api_key):
+    from newsapi import NewsApiClient
+
+    return NewsApiClient(api_key=api_key)
+
+
+@lru_cache(maxsize=None)
+def _reddit_client(client_id, client_secret, user_agent, timeout=DEFAULT_TIMEOUT):
+    import praw
+
+    client = praw.Reddit(
+        client_id=client_id,
+        client_secret=client_secret,
+        user_agent=user_agent,
+        timeout=timeout
+    )
+    return client, threading.Lock()
+
+
+@contextmanager
+def _using_reddit(client_id, client_secret, user_agent, timeout=DEFAULT_TIMEOUT):
+    # praw.Reddit isn't thread-safe and is shared by the fan-out workers and the
+    # feed poller, so one thread at a time; listings are lazy, so consume them inside
+    client, lock = _reddit_client(client_id, client_secret, user_agent, timeout)
+    with lock:
+        yield client
+
+
+def _fetch_top_news(api_key, query="technology", language="en"):
+    newsapi = _newsapi_client(api_key)
+    top_headlines = newsapi.get_top_headlines(q=query, language=language)
+    # return [{"title": top_headline.title, "url": top_headline.url} for top_headline in top_headlines.articles]
+    return [{"title": article["title"], "url": article["url"]} for article in top_headlines["articles"]]
 
 
 def get_top_news(api_key, query="technology", language="en"):
     try:
-        newsapi = NewsApiClient(api_key=api_key)
-        top_headlines = newsapi.get_top_headlines(q=query, language=language)
-        # return [{"title": top_headline.title, "url": top_headline.url} for top_headline in top_headlines.articles]
-        return [{"title": article["title"], "url": article["url"]} for article in top_headlines["articles"]]
+        return _fetch_top_news(api_key, query=query, language=language)
     except Exception as e:
         return [f"Error fetching news: {e}"]
 
 
+def _fetch_stock_blog_rss(rss_url="https://finance.yahoo.com/news/rssindex", timeout=DEFAULT_TIMEOUT):
+    import feedparser
+
+    # feedparser has no timeout of its own, so download with requests and parse the body
+    response = requests.get(rss_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=timeout)
+    response.raise_for_status()
+    feed = feedparser.parse(response.content)
+    return [{"title": entry.title, "link": entry.link} for entry in feed.entries]
+
+
 def get_stock_blog_rss(rss_url="https://finance.yahoo.com/news/rssindex"):
     try:
-        feed = feedparser.parse(rss_url)
-        return [{"title": entry.title, "link": entry.link} for entry in feed.entries]
+        return _fetch_stock_blog_rss(rss_url)
     except Exception as e:
         return [{"title": f"Error fetching RSS: {e}", "link": "#"}]
 
@@ -28,6 +82,9 @@ def get_stock_blog_rss(rss_url="https://finance.yahoo.com/news/rssindex"):
 # --- Twitter (via tweepy) ---
 # def get_twitter_posts(query, count=5):
 #     try:
+#         import streamlit as st
+#         import tweepy
+#
 #         api_key = st.secrets["twitter"]["api_key"]
 #         api_secret = st.secrets["twitter"]["api_secret"]
 #         access_token = st.secrets["twitter"]["access_token"]
@@ -43,14 +100,147 @@ def get_stock_blog_rss(rss_url="https://finance.yahoo.com/news/rssindex"):
 
 # --- Reddit (via praw) ---
 
-def get_reddit_posts(client_id, client_secret, user_agent, subreddit="technology", limit=5):
-    try:
-        reddit = praw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            user_agent=user_agent
-        )
+def _fetch_reddit_posts(client_id, client_secret, user_agent, subreddit="technology", limit=5, timeout=DEFAULT_TIMEOUT):
+    with _using_reddit(client_id, client_secret, user_agent, timeout) as reddit:
         posts = reddit.subreddit(subreddit).hot(limit=limit)
         return [{"title": post.title, "url": post.url} for post in posts]
+
+
+def get_reddit_posts(client_id, client_secret, user_agent, subreddit="technology", limit=5):
+    try:
+        return _fetch_reddit_posts(client_id, client_secret, user_agent, subreddit=subreddit, limit=limit)
     except Exception as e:
         return [{"title": f"Error fetching Reddit posts: {e}", "url": "#"}]
+
+
+# --- Source registry & concurrent fan-out ---
+
+@dataclass
+class Source:
+    name: str
+    title: str
+    fetch: object  # callable(secrets) -> list of dicts
+    link_key: str = "url"
+    timeout: float = DEFAULT_TIMEOUT
+    ttl: float = DEFAULT_TTL
+
+
+@dataclass
+class SourceResult:
+    source: Source
+    items: list = field(default_factory=list)
+    error: str = None
+    latency: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+SOURCES = {}
+
+# process-wide memo of the last result per source: {name: (fetched_at, items, error)}
+_results = {}
+_results_lock = threading.Lock()
+
+
+def register_source(name, title, link_key="url", timeout=DEFAULT_TIMEOUT, ttl=DEFAULT_TTL):
+    def decorator(fetch):
+        SOURCES[name] = Source(name, title, fetch, link_key=link_key, timeout=timeout, ttl=ttl)
+        return fetch
+    return decorator
+
+
+def _remember(source, items=None, error=None):
+    with _results_lock:
+        _results[source.name] = (time.monotonic(), items, error)
+
+
+def _recall(source):
+    """(items, error) of a result still within its TTL, else None."""
+    with _results_lock:
+        entry = _results.get(source.name)
+    if entry and time.monotonic() - entry[0] < (source.ttl if entry[2] is None else min(source.ttl, ERROR_TTL)):
+        return entry[1], entry[2]
+    return None
+
+
+def clear_results(failures_only=False):
+    with _results_lock:
+        for name in [name for name, entry in _results.items() if not failures_only or entry[2] is not None]:
+            del _results[name]
+
+
+@register_source("news", "Top News", link_key="url", timeout=8)
+def _news_source(secrets):
+    return _fetch_top_news(secrets["newsapi"])
+
+
+@register_source("stocks", "Stock Blogs", link_key="link", timeout=8)
+def _stocks_source(secrets):
+    return _fetch_stock_blog_rss(timeout=8)
+
+
+@register_source("reddit", "Reddit Posts", link_key="url", timeout=10)
+def _reddit_source(secrets):
+    reddit = secrets["reddit"]
+    return _fetch_reddit_posts(
+        reddit["client_id"], reddit["client_secret"], reddit["user_agent"], timeout=10
+    )
+
+
+# @register_source("twitter", "Tweets", link_key="url", timeout=8)
+# def _twitter_source(secrets):
+#     return get_twitter_posts("technology")
+
+
+def fetch_all_sources(secrets, sources=None):
+    """Query every registered source in parallel, yielding a SourceResult as each one
+    finishes. A source that misses its own deadline is reported as timed out; its
+    worker thread is abandoned rather than waited for. Results younger than a
+    source's `ttl` are served from memory without a request; so are failures,
+    for at most ERROR_TTL."""
+    sources = list(SOURCES.values()) if sources is None else list(sources)
+    stale = []
+    for source in sources:
+        recalled = _recall(source)
+        if recalled is None:
+            stale.append(source)
+        else:
+            yield SourceResult(source, items=recalled[0] or [], error=recalled[1], cached=True)
+    sources = stale
+    if not sources:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="source")
+    started = time.perf_counter()
+    pending = {executor.submit(source.fetch, secrets): source for source in sources}
+    try:
+        while pending:
+            now = time.perf_counter()
+            next_deadline = min(started + source.timeout for source in pending.values())
+            done, _ = wait(pending, timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+            now = time.perf_counter()
+
+            for future in done:
+                source = pending.pop(future)
+                try:
+                    items = future.result()
+                except Exception as e:
+                    error = f"Error fetching {source.title}: {e}"
+                    _remember(source, error=error)
+                    yield SourceResult(source, error=error, latency=now - started)
+                else:
+                    _remember(source, items)
+                    yield SourceResult(source, items=items, latency=now - started)
+
+            for future, source in list(pending.items()):
+                if now - started >= source.timeout:
+                    del pending[future]
+                    future.cancel()
+                    error = f"{source.title} timed out after {source.timeout:g}s"
+                    _remember(source, error=error)
+                    yield SourceResult(source, error=error, latency=now - started)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)